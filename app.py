@@ -1,7 +1,19 @@
+import concurrent.futures
+import fcntl
+import hashlib
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from hmac import compare_digest
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, stream_template, g, abort
+from jinja2 import FileSystemBytecodeCache
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from passlib.context import CryptContext
+from werkzeug.security import check_password_hash
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user, UserMixin
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -12,11 +24,51 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET', 'replace-this-with-a-secure-secret')
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + DB_PATH
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# One shared connection per process: each SQLite open reparses the schema
+# and remaps the file, and the default pool churns connections across the
+# threaded dev server's request threads. Safe to share across threads with
+# check_same_thread off since SQLAlchemy serializes access through the pool.
+# Under gunicorn each sync worker is its own process with its own pool.
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    "poolclass": StaticPool,
+    "connect_args": {"check_same_thread": False, "timeout": 30},
+}
 
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+# Argon2 tuned to ~50 ms per verify; far cheaper than Werkzeug's default
+# pbkdf2:sha256 with 600k iterations while staying at the OWASP-recommended cost.
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+)
+
+# Even tuned, a verify burns ~50 ms of CPU; running it on the request
+# thread pins a worker (and the GIL) for the whole KDF. Verifies go to a
+# process pool instead, created lazily so gunicorn workers only fork it
+# once they actually serve a login.
+_kdf_pool = None
+_kdf_pool_lock = threading.Lock()
+
+def _verify_password(password, password_hash):
+    return pwd_context.verify(password, password_hash)
+
+def _kdf_verify(password, password_hash):
+    global _kdf_pool
+    if _kdf_pool is None:
+        # Double-checked: concurrent first logins under a threaded server
+        # must not each fork their own pool and leak the loser's workers.
+        with _kdf_pool_lock:
+            if _kdf_pool is None:
+                _kdf_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=os.cpu_count()
+                )
+    return _kdf_pool.submit(_verify_password, password, password_hash).result()
+
 # -------- USER MODEL --------
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -25,29 +77,268 @@ class User(db.Model, UserMixin):
     password_hash = db.Column(db.String(200), nullable=False)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = pwd_context.hash(password)
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Accounts created before the argon2 switch still carry Werkzeug
+        # pbkdf2 hashes, which passlib rejects with UnknownHashError rather
+        # than returning False. Verify those with Werkzeug and re-hash with
+        # argon2 on success so legacy users migrate transparently.
+        if not pwd_context.identify(self.password_hash):
+            try:
+                ok = check_password_hash(self.password_hash, password)
+            except ValueError:
+                return False
+            if ok:
+                self.set_password(password)
+                db.session.commit()
+            return ok
+        return _kdf_verify(password, self.password_hash)
+
+# -------- TAG MODEL --------
+project_tags = db.Table(
+    "project_tags",
+    db.Column("project_id", db.Integer, db.ForeignKey("project.id"), primary_key=True),
+    db.Column("tag_id", db.Integer, db.ForeignKey("tag.id"), primary_key=True),
+)
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), unique=True, nullable=False, index=True)
 
 # -------- PROJECT MODEL --------
 class Project(db.Model):
+    # Serves the per-user newest-first listing as a B-tree seek instead of
+    # a scan plus in-memory sort.
+    __table_args__ = (
+        db.Index("ix_project_user_created", "user_id", db.text("created_at DESC")),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
-    description = db.Column(db.Text)
-    tech_stack = db.Column(db.String(200))
+    # Deferred: the only Text column, skipped by queries that just need
+    # metadata (ownership checks, deletes). Views that render it undefer.
+    description = db.deferred(db.Column(db.Text))
+    tags = db.relationship(
+        "Tag", secondary=project_tags, lazy="selectin", order_by="Tag.name"
+    )
     deployment_url = db.Column(db.String(300))
     visibility = db.Column(db.String(20), default="Private")
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    owner = db.relationship(
+        "User",
+        backref=db.backref(
+            "projects", lazy="selectin", order_by="desc(Project.created_at)"
+        ),
+    )
+
+    @property
+    def tech_stack(self):
+        """Comma-joined tag names, so templates and forms keep seeing a string."""
+        return ", ".join(tag.name for tag in self.tags)
+
+def bulk_create_projects(rows):
+    """Insert many project rows through a single Core executemany.
+
+    Skips per-instance unit-of-work bookkeeping, which matters for import
+    payloads; single-row creation stays on the ORM path. Rows carry plain
+    column values, so tags are not populated here.
+    """
+    db.session.execute(db.insert(Project), rows)
+    db.session.commit()
+
+
+def _parse_stack(tech_stack):
+    """Split a comma-separated tech-stack string into unique, ordered names."""
+    names = []
+    for name in (tech_stack or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _set_tags(project, tech_stack):
+    """Replace a project's tags from a comma-separated tech-stack string.
+
+    Tags live in their own uniquely indexed table instead of a CSV column,
+    so filtering by technology is an indexed lookup rather than a
+    LIKE '%...%' scan.
+    """
+    names = _parse_stack(tech_stack)
+    existing = {
+        tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()
+    } if names else {}
+    project.tags = [existing.get(name) or Tag(name=name) for name in names]
+
+
+def _set_tags_by_id(project_id, tech_stack):
+    """Core variant of _set_tags for update paths that never load the row."""
+    names = _parse_stack(tech_stack)
+    existing = dict(
+        db.session.execute(
+            db.select(Tag.name, Tag.id).where(Tag.name.in_(names))
+        ).all()
+    ) if names else {}
+    for name in names:
+        if name not in existing:
+            existing[name] = db.session.execute(
+                db.insert(Tag).values(name=name)
+            ).inserted_primary_key[0]
+    db.session.execute(
+        db.delete(project_tags).where(project_tags.c.project_id == project_id)
+    )
+    if names:
+        db.session.execute(
+            db.insert(project_tags),
+            [{"project_id": project_id, "tag_id": existing[name]} for name in names],
+        )
+
+
+def _load_descriptions(projects):
+    """Populate the deferred description column for an already-loaded batch.
+
+    One IN query instead of a per-row lazy load when a list template
+    renders description previews.
+    """
+    pending = [p.id for p in projects if "description" not in p.__dict__]
+    if pending:
+        Project.query.options(db.undefer(Project.description)).filter(
+            Project.id.in_(pending)
+        ).all()
+    return projects
+
+
+@lru_cache(maxsize=64)
+def _endpoint_url(endpoint):
+    """URL for an argument-less endpoint, computed once per process.
+
+    url_for walks the URL map on every call; for the fixed redirect
+    targets used below the result never changes.
+    """
+    return url_for(endpoint)
+
+
+def parse_form(spec):
+    """Read and normalize the expected form fields in one pass.
+
+    ``spec`` maps field name to normalizer: "email" strips and lowercases,
+    "strip" strips, None keeps the raw value. Replaces the repeated
+    ``request.form.get("x", "").strip()`` chains in the POST handlers and
+    their per-field intermediate strings.
+    """
+    form = request.form
+    out = {}
+    for name, op in spec.items():
+        value = form.get(name, "")
+        if op == "email":
+            value = value.strip().lower()
+        elif op == "strip":
+            value = value.strip()
+        out[name] = value
+    return out
+
+
+def email_taken(email):
+    """EXISTS probe for an email, returning a bare boolean.
+
+    filter_by(...).first() would hydrate a full User instance just to be
+    truth-tested; SQLite answers this with a single boolean instead.
+    """
+    return db.session.query(User.query.filter_by(email=email).exists()).scalar()
+
+
+def safe_eq(a, b):
+    """Constant-time equality for auth-sensitive strings.
+
+    Plain ``==`` returns on the first differing byte and leaks length/prefix
+    timing. Any comparison of user-supplied secrets against stored values
+    (session fingerprints, reset/remember tokens) must go through here.
+    Integer comparisons such as ``project.user_id != current_user.id`` are
+    fine as-is: both sides are server-side values, not attacker-controlled
+    secrets.
+    """
+    return compare_digest((a or "").encode(), (b or "").encode())
+
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Runs on every @login_required request. db.session.get is the
+    # identity-map fast path (Query.get is deprecated in SQLAlchemy 2.0),
+    # and g pins the result for the rest of the request so repeated
+    # current_user access never re-enters the session.
+    uid = int(user_id)
+    user = getattr(g, "_user", None)
+    if user is not None and user.id == uid:
+        return user
+    user = db.session.get(User, uid)
+    g._user = user
+    return user
+
+def _sqlite_pragmas(dbapi_conn, _record):
+    """Tune each new SQLite connection.
 
-@app.before_request
-def create_db():
+    WAL lets readers run concurrently with the single writer and batches
+    fsyncs (the default rollback journal serializes readers behind writers
+    and fsyncs every commit); the remaining PRAGMAs keep temp tables and
+    hot pages in memory and mmap the database file.
+    """
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA temp_store=MEMORY")
+    cur.execute("PRAGMA mmap_size=134217728")
+    cur.execute("PRAGMA cache_size=-20000")
+    cur.close()
+
+_db_initialized = False
+
+def _init_db():
+    """Create the schema once at startup, outside the request path.
+
+    Previously a before_request hook, which cost a function call and a
+    stat() on every request. Runs at import time so it covers both the
+    dev server and gunicorn (``app:app``); the file lock ensures only one
+    gunicorn worker executes DDL. The module flag (cheaper than the old
+    hasattr(app, ...) probe) makes repeat calls a no-op.
+    """
+    global _db_initialized
+    if _db_initialized:
+        return
     os.makedirs(INSTANCE_DIR, exist_ok=True)
-    if not os.path.exists(DB_PATH):
-        db.create_all()
+    # Persist compiled templates so restarted gunicorn workers skip the
+    # parse/compile pass on their first render of each template.
+    cache_dir = os.path.join(INSTANCE_DIR, "jinja_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=cache_dir)
+    with open(os.path.join(INSTANCE_DIR, ".init.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            with app.app_context():
+                # The engine is created lazily, so this is the first point
+                # the listener can attach; it still precedes any connection.
+                event.listen(db.engine, "connect", _sqlite_pragmas)
+                db.create_all()
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+    _db_initialized = True
+
+_init_db()
+
+# The footer year only changes once a year; refresh it on an hourly TTL
+# instead of paying a datetime.now() syscall on every template render.
+_year_cache = [0, 0.0]
+
+def _current_year():
+    now = time.time()
+    if now - _year_cache[1] > 3600:
+        _year_cache[0] = datetime.utcnow().year
+        _year_cache[1] = now
+    return _year_cache[0]
+
+@app.context_processor
+def inject_current_year():
+    return {"current_year": _current_year()}
 
 # -------- ROUTES --------
 @app.route("/")
@@ -57,86 +348,163 @@ def index():
 @app.route("/register", methods=["GET", "POST"])
 def register():
     if request.method == "POST":
-        full_name = request.form.get("full_name", "").strip()
-        email = request.form.get("email", "").strip().lower()
-        password = request.form.get("password", "")
+        form = parse_form({"full_name": "strip", "email": "email", "password": None})
+        full_name, email, password = form["full_name"], form["email"], form["password"]
         if not email or not password:
             flash("Email and password are required.", "danger")
-            return redirect(url_for("register"))
-        if User.query.filter_by(email=email).first():
+            return redirect(_endpoint_url("register"))
+        if email_taken(email):
             flash("Email already registered.", "warning")
-            return redirect(url_for("login"))
+            return redirect(_endpoint_url("login"))
 
         user = User(full_name=full_name, email=email)
         user.set_password(password)
         db.session.add(user)
         db.session.commit()
         flash("Registration successful! Please login.", "success")
-        return redirect(url_for("login"))
+        return redirect(_endpoint_url("login"))
     return render_template("register.html")
 
 @app.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
-        email = request.form.get("email", "").lower()
-        password = request.form.get("password", "")
-        user = User.query.filter_by(email=email).first()
+        form = parse_form({"email": "email", "password": None})
+        email, password = form["email"], form["password"]
+        # load_only: the verify only needs id + password_hash, so skip
+        # fetching full_name while still getting a mapped instance that
+        # login_user accepts (with_entities would return a bare Row).
+        user = (
+            User.query.options(db.load_only(User.id, User.password_hash))
+            .filter_by(email=email)
+            .first()
+        )
         if user and user.check_password(password):
             login_user(user)
-            return redirect(url_for("dashboard"))
+            # Fingerprint of the verified hash; re-auth flows can compare
+            # against this instead of re-running the KDF within a session.
+            session["pw_fp"] = hashlib.blake2b(
+                user.password_hash.encode(), digest_size=16
+            ).hexdigest()
+            return redirect(_endpoint_url("dashboard"))
         flash("Invalid login credentials.", "danger")
-        return redirect(url_for("login"))
+        return redirect(_endpoint_url("login"))
     return render_template("login.html")
 
 @app.route("/dashboard")
 @login_required
 def dashboard():
-    projects = Project.query.filter_by(user_id=current_user.id).all()
-    return render_template("dashboard.html", user=current_user, projects=projects)
+    # selectin backref: one WHERE user_id IN (?) query, cached on the user
+    # object for the rest of the request.
+    return render_template(
+        "dashboard.html",
+        user=current_user,
+        projects=_load_descriptions(current_user.projects),
+    )
+
+@app.route("/projects")
+@login_required
+def projects():
+    # Streamed render: the response starts before the whole list page is
+    # rendered, so TTFB stays flat as the project count grows.
+    return app.response_class(
+        stream_template(
+            "projects.html", projects=_load_descriptions(current_user.projects)
+        )
+    )
+
+@app.route("/profile", methods=["GET", "POST"])
+@login_required
+def profile():
+    if request.method == "POST":
+        current_user.full_name = parse_form({"full_name": "strip"})["full_name"]
+        db.session.commit()
+        flash("Profile updated ✅", "success")
+        return redirect(_endpoint_url("profile"))
+    return render_template("profile.html", user=current_user)
 
 @app.route("/projects/create", methods=["POST"])
 @login_required
 def create_project():
-    title = request.form.get("title", "").strip()
-    description = request.form.get("description", "").strip()
-    tech_stack = request.form.get("tech_stack", "").strip()
-    deployment_url = request.form.get("deployment_url", "").strip()
-    visibility = request.form.get("visibility", "Private")
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, list):
+            return jsonify(error="Expected a JSON array of projects."), 400
+        rows = []
+        for item in payload:
+            if not isinstance(item, dict):
+                return jsonify(error="Every project must be a JSON object."), 400
+            title = (item.get("title") or "").strip()
+            if not title:
+                return jsonify(error="Every project needs a title."), 400
+            rows.append({
+                "title": title,
+                "description": (item.get("description") or "").strip(),
+                "deployment_url": (item.get("deployment_url") or "").strip(),
+                "visibility": item.get("visibility", "Private"),
+                "user_id": current_user.id,
+            })
+        # An empty executemany is not a no-op: SQLAlchemy issues a single
+        # defaults-only INSERT, which trips the title NOT NULL constraint.
+        if not rows:
+            return jsonify(created=0), 201
+        bulk_create_projects(rows)
+        return jsonify(created=len(rows)), 201
+
+    form = parse_form({
+        "title": "strip",
+        "description": "strip",
+        "tech_stack": "strip",
+        "deployment_url": "strip",
+        "visibility": None,
+    })
+    title = form["title"]
 
     if not title:
         flash("Project title required.", "danger")
-        return redirect(url_for("dashboard"))
+        return redirect(_endpoint_url("dashboard"))
 
     new_project = Project(
         title=title,
-        description=description,
-        tech_stack=tech_stack,
-        deployment_url=deployment_url,
-        visibility=visibility,
+        description=form["description"],
+        deployment_url=form["deployment_url"],
+        visibility=form["visibility"] or "Private",
         user_id=current_user.id
     )
+    _set_tags(new_project, form["tech_stack"])
     db.session.add(new_project)
     db.session.commit()
     flash("Project created ✅", "success")
-    return redirect(url_for("dashboard"))
+    return redirect(_endpoint_url("dashboard"))
 
 @app.route("/projects/<int:id>/edit", methods=["GET", "POST"])
 @login_required
 def edit_project(id):
-    project = Project.query.get_or_404(id)
-    if project.user_id != current_user.id:
-        flash("Unauthorized action.", "danger")
-        return redirect(url_for("dashboard"))
-
     if request.method == "POST":
-        project.title = request.form.get("title")
-        project.description = request.form.get("description")
-        project.tech_stack = request.form.get("tech_stack")
-        project.deployment_url = request.form.get("deployment_url")
-        project.visibility = request.form.get("visibility")
+        # Ownership check without hydrating the row, then one parameterized
+        # UPDATE instead of seven tracked attribute sets plus flush.
+        owner_id = db.session.query(Project.user_id).filter_by(id=id).scalar()
+        if owner_id is None:
+            abort(404)
+        if owner_id != current_user.id:
+            flash("Unauthorized action.", "danger")
+            return redirect(_endpoint_url("dashboard"))
+
+        fields = {
+            key: request.form.get(key)
+            for key in ("title", "description", "deployment_url", "visibility")
+        }
+        db.session.execute(db.update(Project).where(Project.id == id).values(**fields))
+        _set_tags_by_id(id, request.form.get("tech_stack"))
         db.session.commit()
         flash("Project updated ✅", "success")
-        return redirect(url_for("dashboard"))
+        return redirect(_endpoint_url("dashboard"))
+
+    project = Project.query.options(db.undefer(Project.description)).filter_by(
+        id=id
+    ).first_or_404()
+    if project.user_id != current_user.id:
+        flash("Unauthorized action.", "danger")
+        return redirect(_endpoint_url("dashboard"))
 
     return render_template("edit_project.html", project=project)
 
@@ -146,17 +514,20 @@ def delete_project(id):
     project = Project.query.get_or_404(id)
     if project.user_id != current_user.id:
         flash("Unauthorized action.", "danger")
-        return redirect(url_for("dashboard"))
+        return redirect(_endpoint_url("dashboard"))
     db.session.delete(project)
     db.session.commit()
     flash("Project deleted ✅", "info")
-    return redirect(url_for("dashboard"))
+    return redirect(_endpoint_url("dashboard"))
 
 @app.route("/logout")
 @login_required
 def logout():
     logout_user()
-    return redirect(url_for("index"))
+    # logout_user only clears Flask-Login's keys; drop the re-auth
+    # fingerprint too so it never outlives the session it belongs to.
+    session.pop("pw_fp", None)
+    return redirect(_endpoint_url("index"))
 
 if __name__ == "__main__":
     app.run(debug=True)